@@ -16,6 +16,8 @@ Translations are fetched from github repositories according to PEP
 build all translations (default) or "--languages en" to skip all
 translations (as en is the untranslated version)..
 
+-j runs the given number of (version, language) builds in parallel.
+
 This script was originally created and by Georg Brandl in March
 2010.
 Modified by Benjamin Peterson to do CDN cache invalidation.
@@ -23,7 +25,8 @@ Modified by Julien Palard to build translations.
 
 """
 
-import filecmp
+import grp
+import hashlib
 import json
 import logging
 import logging.handlers
@@ -31,11 +34,21 @@ import os
 import re
 import shlex
 import shutil
+import stat
 import subprocess
 import sys
+import tempfile
+import time
 from bisect import bisect_left as bisect
 from collections import OrderedDict, namedtuple
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from contextlib import contextmanager, suppress
+from functools import lru_cache
 from pathlib import Path
 from string import Template
 from textwrap import indent
@@ -99,6 +112,13 @@ Language = namedtuple(
     "Language", ["tag", "iso639_tag", "name", "in_prod", "sphinxopts"]
 )
 
+# Paths of a virtual environment built by build_venv.
+Venv = namedtuple("Venv", ["path", "python", "sphinxbuild", "blurb"])
+
+# Outcome of build_one: whether the archives of Doc/dist were rebuilt, and
+# {path: data} JSON records to write once the build is published.
+BuildResult = namedtuple("BuildResult", ["dist_built", "records"])
+
 # EOL and security-fixes are not automatically built, no need to remove them
 # from the list, this way we can still rebuild them manually as needed.
 # Please pin the sphinx_versions of EOL and security-fixes, as we're not maintaining
@@ -110,9 +130,7 @@ VERSIONS = [
     Version("3.7", "3.7", "security-fixes", sphinx_version="2.3.1"),
     Version("3.8", "3.8", "security-fixes", sphinx_version="2.4.4"),
     Version("3.9", "3.9", "stable", sphinx_version="2.4.4"),
-    Version(
-        "3.10", "main", "in development", sphinx_version="3.2.1", sphinxopts=["-j4"]
-    ),
+    Version("3.10", "main", "in development", sphinx_version="3.2.1"),
 ]
 
 XELATEX_DEFAULT = (
@@ -160,24 +178,84 @@ LANGUAGES = {
 }
 
 
-def run(cmd) -> subprocess.CompletedProcess:
-    """Like subprocess.run, with logging before and after the command execution."""
+# Matches the version of a branch named after it, like refs/heads/3.9.
+VERSION_BRANCH = re.compile(r"/([0-9]+\.[0-9]+)$")
+
+# Footer of HTML pages, it holds the "Last updated on" date.
+HTML_FOOTER = re.compile(rb'<div class="footer">.*?</div>', re.DOTALL)
+
+# Paths of the cpython repository the documentation is known not to be
+# built from. Commits only touching these don't need a new docs build,
+# commits touching anything else do: the docs also read files out of
+# Doc, like Misc/NEWS.d, Grammar, Parser, or Include/patchlevel.h.
+NON_DOCS_SOURCES = (
+    ".azure-pipelines/",
+    ".github/",
+    "Lib/",
+    "Mac/",
+    "Modules/",
+    "Objects/",
+    "PC/",
+    "PCbuild/",
+    "Python/",
+)
+
+# CDN purges run in the background, so the HTML purge overlaps with the
+# copy of the archives, see purge_in_background().
+PURGE_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+# Number of URLs given to each curl invocation while purging the CDN.
+PURGE_BATCH_SIZE = 256
+
+
+def run(cmd, input="", log=None) -> subprocess.CompletedProcess:
+    """Like subprocess.run, with logging before and after the command execution.
+
+    If log, a file opened in "ab+" mode, is given, the output is streamed
+    to it instead of being kept in memory, and the result has no stdout.
+    """
     cmdstring = shlex.join(cmd)
     logging.debug("Run: %r", cmdstring)
-    result = subprocess.run(
-        cmd,
-        stdin=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        stdout=subprocess.PIPE,
-        encoding="utf-8",
-        errors="backslashreplace",
-    )
+    if log is None:
+        result = subprocess.run(
+            cmd,
+            input=input,
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            errors="backslashreplace",
+        )
+        output = result.stdout
+    else:
+        log.write(
+            b"# %s %s\n"
+            % (time.strftime("%Y-%m-%dT%H:%M:%S").encode(), cmdstring.encode())
+        )
+        log.flush()
+        start = log.tell()
+        started = time.monotonic()
+        result = subprocess.run(
+            cmd,
+            input=input,
+            stderr=subprocess.STDOUT,
+            stdout=log,
+            encoding="utf-8",
+        )
+        end = log.seek(0, os.SEEK_END)
+        output = ""
+        if result.returncode:
+            log.seek(max(start, end - 64 * 1024))
+            output = log.read().decode("utf-8", errors="backslashreplace")
+        log.write(
+            b"# Exit status %d after %.1fs\n"
+            % (result.returncode, time.monotonic() - started)
+        )
     if result.returncode:
         # Log last 20 lines, those are likely the interesting ones.
         logging.error(
             "Run KO: %r:\n%s",
             cmdstring,
-            indent("\n".join(result.stdout.split("\n")[-20:]), "    "),
+            indent("\n".join(output.split("\n")[-20:]), "    "),
         )
     else:
         logging.debug("Run OK: %r", cmdstring)
@@ -185,23 +263,190 @@ def run(cmd) -> subprocess.CompletedProcess:
     return result
 
 
-def changed_files(left, right):
+def atomic_write(path, data: bytes):
+    """Write data to path, so path never holds a partial write.
+
+    The data is written to a temporary file, synced to disk, and renamed
+    over path, so after a crash path holds either its previous content
+    or the new one. Concurrent writers don't interleave either.
+    """
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            os.fchmod(file.fileno(), 0o644)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def dump_json(data, path):
+    """Write data to the given JSON file, see atomic_write."""
+    atomic_write(path, json.dumps(data).encode("utf-8"))
+
+
+def file_hash(path):
+    """Compute the BLAKE2b hexdigest of the given file content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashes_cache_path(build_root, version, language: Language):
+    """Path of the file caching content hashes of a published build.
+
+    It's kept in build_root, not next to the published files, so it's
+    not served.
+    """
+    return os.path.join(
+        build_root, version.name, "published-{}.hashes.json".format(language.tag)
+    )
+
+
+def load_json(path):
+    """Load the given JSON file, returns None if missing or corrupted."""
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+
+def changed_files(left, right, hashes=None, sync_mtimes=False):
     """Compute a list of different files between left and right, recursively.
-    Resulting paths are relative to left.
+    Resulting paths are relative to left. Files missing in right are
+    considered different.
+
+    Files with the same size and modification time (to the second) are
+    considered identical without being read, like rsync does. Files with
+    the same size but another modification time are compared by content,
+    as Sphinx rewrites identical files. hashes is a {path: [size,
+    mtime_ns, digest]} cache of the files in right, it is used instead of
+    hashing right again when size and mtime still match.
+
+    With sync_mtimes, files of left found identical by content get the
+    modification time of their counterpart in right, so that an rsync
+    from left to right doesn't copy them again.
+
+    Returns the list of changed files, and a new hashes cache describing
+    left, which is what right contains once left is copied to it. Files
+    no longer in left are not in the new cache.
     """
     changed = []
+    if hashes is None:
+        hashes = {}
+    new_hashes = {}
+    # Directories from os.walk are left_prefix followed by a relative path,
+    # except left itself.
+    left_prefix = os.path.join(left, "")
+    for dirpath, dirnames, filenames in os.walk(left, followlinks=True):
+        directory = dirpath[len(left_prefix) :]
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            left_stat = os.stat(os.path.join(dirpath, filename))
+            try:
+                right_stat = os.stat(os.path.join(right, path))
+            except FileNotFoundError:
+                # New file: the CDN may have cached a 404 for it.
+                right_stat = None
+            cached = hashes.get(path)
+            if right_stat and left_stat.st_size == right_stat.st_size:
+                mtime_delta = abs(left_stat.st_mtime_ns - right_stat.st_mtime_ns)
+                if mtime_delta < 1_000_000_000:
+                    if cached:
+                        new_hashes[path] = cached
+                    continue
+                left_digest = file_hash(os.path.join(dirpath, filename))
+                new_hashes[path] = [
+                    left_stat.st_size,
+                    left_stat.st_mtime_ns,
+                    left_digest,
+                ]
+                right_key = [right_stat.st_size, right_stat.st_mtime_ns]
+                if cached and cached[:2] == right_key:
+                    right_digest = cached[2]
+                else:
+                    right_digest = file_hash(os.path.join(right, path))
+                if right_digest == left_digest:
+                    if sync_mtimes:
+                        os.utime(
+                            os.path.join(dirpath, filename),
+                            ns=(right_stat.st_atime_ns, right_stat.st_mtime_ns),
+                        )
+                        new_hashes[path] = right_key + [right_digest]
+                    continue
+            changed.append(path)
+            if filename == "index.html" and directory:
+                changed.append(directory + "/")
+    return changed, new_hashes
+
 
-    def traverse(dircmp_result):
-        base = Path(dircmp_result.left).relative_to(left)
-        for file in dircmp_result.diff_files:
-            changed.append(str(base / file))
-            if file == "index.html":
-                changed.append(str(base) + "/")
-        for dircomp in dircmp_result.subdirs.values():
-            traverse(dircomp)
+def html_tree_hash(directory):
+    """Compute a BLAKE2b hexdigest of the paths and contents of an HTML tree.
 
-    traverse(filecmp.dircmp(left, right))
-    return changed
+    Page footers are left out, as they hold the date of the build.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    prefix_length = len(os.path.join(directory, ""))
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            digest.update(path[prefix_length:].encode("utf-8") + b"\0")
+            if filename.endswith(".html"):
+                with open(path, "rb") as html_file:
+                    digest.update(HTML_FOOTER.sub(b"", html_file.read()))
+            else:
+                digest.update(file_hash(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def group_id(group):
+    """Get the id of the given group, given by name or by id."""
+    try:
+        return grp.getgrnam(group).gr_gid
+    except KeyError:
+        return int(group)
+
+
+def make_world_readable(directory, group):
+    """Give a tree to the given group and make it world readable.
+
+    Equivalent to `chown -R :group`, `chmod -R o+r`, and `chmod o+x` on
+    directories, in a single walk and without spawning processes.
+    """
+    gid = group_id(group)
+    for dirpath, dirnames, filenames in os.walk(directory):
+        paths = [(dirpath, stat.S_IROTH | stat.S_IXOTH)]
+        paths.extend(
+            (os.path.join(dirpath, filename), stat.S_IROTH) for filename in filenames
+        )
+        for path, mode in paths:
+            path_stat = os.lstat(path)
+            if stat.S_ISLNK(path_stat.st_mode):
+                continue
+            if path_stat.st_gid != gid:
+                os.chown(path, -1, gid)
+            if path_stat.st_mode & mode != mode:
+                os.chmod(path, stat.S_IMODE(path_stat.st_mode) | mode)
+
+
+def git_fetch(directory, attempts=3):
+    """Fetch the given repository, retrying with an exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            run(["git", "-C", directory, "fetch"])
+            return
+        except subprocess.CalledProcessError:
+            if attempt == attempts - 1:
+                raise
+            logging.warning("Fetch failed in %s, retrying", directory)
+            time.sleep(2 ** attempt)
 
 
 def git_clone(repository, directory, branch=None):
@@ -212,26 +457,133 @@ def git_clone(repository, directory, branch=None):
     try:
         if not os.path.isdir(os.path.join(directory, ".git")):
             raise AssertionError("Not a git repository.")
-        run(["git", "-C", directory, "fetch"])
+        git_fetch(directory)
         if branch:
             run(["git", "-C", directory, "checkout", branch])
             run(["git", "-C", directory, "reset", "--hard", "origin/" + branch])
-    except (subprocess.CalledProcessError, AssertionError):
-        if os.path.exists(directory):
+        return
+    except AssertionError:
+        if os.path.isdir(directory) and os.listdir(directory):
             shutil.rmtree(directory)
-        logging.info("Cloning %s into %s", repository, directory)
-        os.makedirs(directory, mode=0o775)
-        run(["git", "clone", "--depth=1", "--no-single-branch", repository, directory])
-        if branch:
-            run(["git", "-C", directory, "checkout", branch])
+    except subprocess.CalledProcessError:
+        shutil.rmtree(directory)
+    logging.info("Cloning %s into %s", repository, directory)
+    os.makedirs(directory, mode=0o775, exist_ok=True)
+    run(["git", "clone", "--depth=1", "--no-single-branch", repository, directory])
+    if branch:
+        run(["git", "-C", directory, "checkout", branch])
+
+
+def update_cpython_mirror(mirror):
+    """Create or update a bare clone of cpython.
+
+    Checkouts are worktrees of this clone (see git_worktree), so they
+    share its objects, and cpython is fetched once per run.
+    """
+    logging.info("Updating cpython mirror in %s", mirror)
+    if os.path.isdir(mirror):
+        try:
+            git_fetch(mirror)
+            return
+        except subprocess.CalledProcessError:
+            logging.warning("Can't update %s, cloning it again", mirror)
+            shutil.rmtree(mirror)
+    # Clone aside and move it in place once configured, so an interrupted
+    # clone never leaves a mirror that fetches nothing.
+    partial = mirror + ".partial"
+    if os.path.isdir(partial):
+        shutil.rmtree(partial)
+    run(["git", "clone", "--bare", "https://github.com/python/cpython.git", partial])
+    run(
+        [
+            "git",
+            "-C",
+            partial,
+            "config",
+            "remote.origin.fetch",
+            "+refs/heads/*:refs/heads/*",
+        ]
+    )
+    os.replace(partial, mirror)
+
+
+def git_worktree(mirror, directory, branch):
+    """Check out the given branch of mirror in directory, as a worktree.
+
+    An existing worktree is reused, so build outputs are kept.
+    """
+    logging.info("Updating worktree %s on %s", directory, branch)
+    if os.path.isfile(os.path.join(directory, ".git")):
+        try:
+            run(["git", "-C", directory, "checkout", "--force", "--detach", branch])
+            return
+        except subprocess.CalledProcessError:
+            # Like when the mirror was recreated, the worktree is then broken.
+            logging.warning("Can't update worktree %s, recreating it", directory)
+    # Not a (working) worktree, maybe a full clone made by a previous
+    # version of this script.
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    run(["git", "-C", mirror, "worktree", "prune"])
+    run(
+        [
+            "git",
+            "-C",
+            mirror,
+            "worktree",
+            "add",
+            "--force",
+            "--detach",
+            directory,
+            branch,
+        ]
+    )
+
+
+def same_docs_sources(checkout, previous_state, state):
+    """Tell if two build states only differ by cpython commits that only
+    touched NON_DOCS_SOURCES.
+    """
+    if previous_state is None:
+        return False
+    for key in state:
+        if key != "cpython" and previous_state.get(key) != state[key]:
+            return False
+    try:
+        changes = run(
+            [
+                "git",
+                "-C",
+                checkout,
+                "diff",
+                "--name-only",
+                previous_state["cpython"],
+                state["cpython"],
+            ]
+        ).stdout
+    except (KeyError, subprocess.CalledProcessError):
+        return False
+    return all(path.startswith(NON_DOCS_SOURCES) for path in changes.splitlines())
+
+
+def git_head(directory):
+    """Get the commit currently checked out in the given repository."""
+    return run(["git", "-C", directory, "rev-parse", "HEAD"]).stdout.strip()
 
 
 def version_to_tuple(version):
     return tuple(int(part) for part in version.split("."))
 
 
-def tuple_to_version(version_tuple):
-    return ".".join(str(part) for part in version_tuple)
+@lru_cache(maxsize=None)
+def sorted_versions(versions):
+    """Sort and deduplicate the given tuple of versions.
+
+    Returns both the version tuples, usable as bisect keys, and the
+    matching version strings.
+    """
+    parsed = sorted((version_to_tuple(version), version) for version in set(versions))
+    return tuple(key for key, _ in parsed), tuple(version for _, version in parsed)
 
 
 def locate_nearest_version(available_versions, target_version):
@@ -250,36 +602,35 @@ def locate_nearest_version(available_versions, target_version):
     '3.7'
     """
 
-    available_versions_tuples = sorted(
-        [
-            version_to_tuple(available_version)
-            for available_version in set(available_versions)
-        ]
-    )
-    target_version_tuple = version_to_tuple(target_version)
-    try:
-        found = available_versions_tuples[
-            bisect(available_versions_tuples, target_version_tuple)
-        ]
-    except IndexError:
-        found = available_versions_tuples[-1]
-    return tuple_to_version(found)
+    keys, versions = sorted_versions(tuple(available_versions))
+    index = bisect(keys, version_to_tuple(target_version))
+    return versions[min(index, len(versions) - 1)]
+
+
+@lru_cache(maxsize=None)
+def translation_branches(locale_repo):
+    """List the version branches of the given translation repository.
+
+    Branches don't change during a run, so they are only listed once per
+    repository (and per process).
+    """
+    remote_branches = run(["git", "ls-remote", "--heads", locale_repo]).stdout
+    branches = []
+    for branch in remote_branches.splitlines():
+        match = VERSION_BRANCH.search(branch)
+        if match:
+            branches.append(match.group(1))
+    return tuple(branches)
 
 
-def translation_branch(locale_repo, locale_clone_dir, needed_version):
+def translation_branch(locale_repo, needed_version):
     """Some cpython versions may be untranslated, being either too old or
     too new.
 
     This function looks for remote branches on the given repo, and
     returns the name of the nearest existing branch.
     """
-    git_clone(locale_repo, locale_clone_dir)
-    remote_branches = run(["git", "-C", locale_clone_dir, "branch", "-r"]).stdout
-    branches = []
-    for branch in remote_branches.split("\n"):
-        if re.match(r".*/[0-9]+\.[0-9]+$", branch):
-            branches.append(branch.split("/")[-1])
-    return locate_nearest_version(branches, needed_version)
+    return locate_nearest_version(translation_branches(locale_repo), needed_version)
 
 
 @contextmanager
@@ -306,7 +657,7 @@ def picker_label(version):
     return version.name
 
 
-def setup_indexsidebar(dest_path):
+def render_indexsidebar():
     versions_li = []
     for version in sorted(
         VERSIONS,
@@ -318,11 +669,45 @@ def setup_indexsidebar(dest_path):
         )
 
     with open(HERE / "templates" / "indexsidebar.html") as sidebar_template_file:
-        with open(dest_path, "w") as sidebar_file:
-            template = Template(sidebar_template_file.read())
-            sidebar_file.write(
-                template.safe_substitute({"VERSIONS": "\n".join(versions_li)})
-            )
+        template = Template(sidebar_template_file.read())
+    return template.safe_substitute({"VERSIONS": "\n".join(versions_li)})
+
+
+def setup_indexsidebar(dest_path):
+    with open(dest_path, "w") as sidebar_file:
+        sidebar_file.write(render_indexsidebar())
+
+
+def render_switchers():
+    with open(HERE / "templates" / "switchers.js") as switchers_template_file:
+        template = Template(switchers_template_file.read())
+    return template.safe_substitute(
+        {
+            "LANGUAGES": json.dumps(
+                OrderedDict(
+                    sorted(
+                        [
+                            (language.tag, language.name)
+                            for language in LANGUAGES
+                            if language.in_prod
+                        ]
+                    )
+                )
+            ),
+            "VERSIONS": json.dumps(
+                OrderedDict(
+                    [
+                        (version.name, picker_label(version))
+                        for version in sorted(
+                            VERSIONS,
+                            key=lambda v: version_to_tuple(v.name),
+                            reverse=True,
+                        )
+                    ]
+                )
+            ),
+        }
+    )
 
 
 def setup_switchers(html_root):
@@ -330,40 +715,10 @@ def setup_switchers(html_root):
     - Cross-link various languages in a language switcher
     - Cross-link various versions in a version switcher
     """
-    with open(HERE / "templates" / "switchers.js") as switchers_template_file:
-        with open(
-            os.path.join(html_root, "_static", "switchers.js"), "w"
-        ) as switchers_file:
-            template = Template(switchers_template_file.read())
-            switchers_file.write(
-                template.safe_substitute(
-                    {
-                        "LANGUAGES": json.dumps(
-                            OrderedDict(
-                                sorted(
-                                    [
-                                        (language.tag, language.name)
-                                        for language in LANGUAGES
-                                        if language.in_prod
-                                    ]
-                                )
-                            )
-                        ),
-                        "VERSIONS": json.dumps(
-                            OrderedDict(
-                                [
-                                    (version.name, picker_label(version))
-                                    for version in sorted(
-                                        VERSIONS,
-                                        key=lambda v: version_to_tuple(v.name),
-                                        reverse=True,
-                                    )
-                                ]
-                            )
-                        ),
-                    }
-                )
-            )
+    with open(
+        os.path.join(html_root, "_static", "switchers.js"), "w"
+    ) as switchers_file:
+        switchers_file.write(render_switchers())
     for file in Path(html_root).glob("**/*.html"):
         depth = len(file.relative_to(html_root).parts) - 1
         script = """    <script type="text/javascript" src="{}_static/switchers.js"></script>\n""".format(
@@ -381,11 +736,12 @@ def setup_switchers(html_root):
 def build_one(
     version,
     quick,
-    venv,
+    venv: Venv,
     build_root,
-    group,
     log_directory,
     language: Language,
+    sphinx_jobs="auto",
+    theme="python-docs-theme",
 ):
     checkout = os.path.join(
         build_root, version.name, "cpython-{lang}".format(lang=language.tag)
@@ -393,7 +749,10 @@ def build_one(
     logging.info(
         "Build start for version: %s, language: %s", version.name, language.tag
     )
-    sphinxopts = list(language.sphinxopts) + list(version.sphinxopts)
+    # Version specific options come last, so they can override -j.
+    jobs_option = "-j {}".format(sphinx_jobs)
+    sphinxopts = list(language.sphinxopts) + [jobs_option]
+    sphinxopts.extend(version.sphinxopts)
     sphinxopts.extend(["-q"])
     if language.tag != "en":
         locale_dirs = os.path.join(build_root, version.name, "locale")
@@ -404,7 +763,7 @@ def build_one(
         git_clone(
             locale_repo,
             locale_clone_dir,
-            translation_branch(locale_repo, locale_clone_dir, version.name),
+            translation_branch(locale_repo, version.name),
         )
         sphinxopts.extend(
             (
@@ -415,16 +774,46 @@ def build_one(
         )
     if version.status == "EOL":
         sphinxopts.append("-D html_context.outdated=1")
-    git_clone("https://github.com/python/cpython.git", checkout, version.branch)
+    git_worktree(os.path.join(build_root, "cpython.git"), checkout, version.branch)
     maketarget = (
         "autobuild-"
         + ("dev" if version.status in ("in development", "pre-release") else "stable")
         + ("-html" if quick else "")
     )
+    # The parallelism of sphinx-build does not change its output.
+    significant_sphinxopts = [opt for opt in sphinxopts if opt != jobs_option]
+    build_state = {
+        "cpython": git_head(checkout),
+        "locale": git_head(locale_clone_dir) if language.tag != "en" else None,
+        "maketarget": maketarget,
+        "sphinxopts": hashlib.blake2b(
+            " ".join(significant_sphinxopts).encode("utf-8"), digest_size=16
+        ).hexdigest(),
+        "venv": venv.path,
+        "theme": theme,
+        # The version and language pickers are written by this script.
+        "pickers": hashlib.blake2b(
+            (render_indexsidebar() + render_switchers()).encode("utf-8"),
+            digest_size=16,
+        ).hexdigest(),
+    }
+    marker = os.path.join(
+        log_directory, "{}-{}.built".format(language.tag, version.name)
+    )
+    previous_state = load_json(marker)
+    if os.path.isdir(os.path.join(checkout, "Doc", "build", "html")) and (
+        previous_state == build_state
+        or same_docs_sources(checkout, previous_state, build_state)
+    ):
+        logging.info(
+            "Build up to date for version: %s, language: %s",
+            version.name,
+            language.tag,
+        )
+        return BuildResult(False, {marker: build_state})
+    with suppress(FileNotFoundError):
+        os.unlink(marker)
     logging.info("Running make %s", maketarget)
-    python = os.path.join(venv, "bin/python")
-    sphinxbuild = os.path.join(venv, "bin/sphinx-build")
-    blurb = os.path.join(venv, "bin/blurb")
     # Disable cpython switchers, we handle them now:
     run(
         [
@@ -437,23 +826,60 @@ def build_one(
     setup_indexsidebar(
         os.path.join(checkout, "Doc", "tools", "templates", "indexsidebar.html")
     )
-    run(
-        [
-            "make",
-            "-C",
-            os.path.join(checkout, "Doc"),
-            "PYTHON=" + python,
-            "SPHINXBUILD=" + sphinxbuild,
-            "BLURB=" + blurb,
-            "VENVDIR=" + venv,
-            "SPHINXOPTS=" + " ".join(sphinxopts),
-            "SPHINXERRORHANDLING=",
-            maketarget,
-        ]
+    make = [
+        "make",
+        "-C",
+        os.path.join(checkout, "Doc"),
+        "PYTHON=" + venv.python,
+        "SPHINXBUILD=" + venv.sphinxbuild,
+        "BLURB=" + venv.blurb,
+        "VENVDIR=" + venv.path,
+        "SPHINXERRORHANDLING=",
+    ]
+    sphinxopts_variable = "SPHINXOPTS=" + " ".join(sphinxopts)
+    logfile = os.path.join(
+        log_directory, "{}-{}.log".format(language.tag, version.name)
     )
-    run(["chgrp", "-R", group, log_directory])
+    records = {marker: build_state}
+    dist_built = False
+    with open(logfile, "ab+") as log:
+        if quick:
+            run(make + [sphinxopts_variable, maketarget], log=log)
+        else:
+            # Build the HTML alone first: LaTeX and PDF archives are only
+            # rebuilt when the HTML output changed.
+            run(make + [sphinxopts_variable, maketarget + "-html"], log=log)
+            # The archives also depend on what the HTML does not show, like
+            # LaTeX options or the Sphinx version, so these inputs are
+            # recorded along with the HTML hash.
+            dist_state = {
+                "html": html_tree_hash(os.path.join(checkout, "Doc", "build", "html")),
+                "maketarget": build_state["maketarget"],
+                "sphinxopts": build_state["sphinxopts"],
+                "venv": build_state["venv"],
+                "theme": build_state["theme"],
+            }
+            html_hash_file = os.path.join(
+                log_directory, "{}-{}.htmlhash".format(language.tag, version.name)
+            )
+            dist = os.path.join(checkout, "Doc", "dist")
+            if (
+                load_json(html_hash_file) == dist_state
+                and os.path.isdir(dist)
+                and os.listdir(dist)
+            ):
+                logging.info("HTML and its inputs unchanged, skipping archives build")
+            else:
+                # Not the full autobuild target, which passes -Ea and would
+                # rebuild the HTML from scratch: without it, the HTML build
+                # done by the dist target reuses the one above. -A daily=1
+                # is passed by autobuild targets, it keeps the same config.
+                run(make + [sphinxopts_variable + " -A daily=1", "dist"], log=log)
+                records[html_hash_file] = dist_state
+                dist_built = True
     setup_switchers(os.path.join(checkout, "Doc", "build", "html"))
     logging.info("Build done for version: %s, language: %s", version.name, language.tag)
+    return BuildResult(dist_built, records)
 
 
 def build_venv(build_root, version, theme):
@@ -467,12 +893,15 @@ def build_venv(build_root, version, theme):
         "sphinx=={}".format(version.sphinx_version),
     ]
     venv_path = os.path.join(build_root, "venv-with-sphinx-" + version.sphinx_version)
-    run(["python3", "-m", "venv", venv_path])
-    run(
-        [os.path.join(venv_path, "bin", "python"), "-m", "pip", "install"]
-        + requirements
+    venv = Venv(
+        venv_path,
+        os.path.join(venv_path, "bin", "python"),
+        os.path.join(venv_path, "bin", "sphinx-build"),
+        os.path.join(venv_path, "bin", "blurb"),
     )
-    return venv_path
+    run(["python3", "-m", "venv", venv.path])
+    run([venv.python, "-m", "pip", "install"] + requirements)
+    return venv
 
 
 def build_robots_txt(www_root, group, skip_cache_invalidation):
@@ -499,6 +928,39 @@ def build_robots_txt(www_root, group, skip_cache_invalidation):
         )
 
 
+def cdn_prefixes(www_root, target):
+    """List the URL prefixes under which target is served, like "3.9/" and
+    "3/", as seen from symlinks in www_root.
+    """
+    prefixes = run(["find", "-L", www_root, "-samefile", target]).stdout
+    prefixes = prefixes.replace(www_root + "/", "")
+    return [prefix + "/" for prefix in prefixes.split("\n") if prefix]
+
+
+def purge_in_background(paths):
+    """Purge the given paths of docs.python.org from the CDN, without waiting.
+
+    Returns the futures of the purges, callers have to wait for them.
+    """
+    logging.info("Running CDN purge")
+    urls = ["https://docs.python.org/" + path for path in paths]
+    futures = []
+    for start in range(0, len(urls), PURGE_BATCH_SIZE):
+        # One curl per batch, reusing its connection for every URL of the batch.
+        config = "".join(
+            'url = "{}"\n'.format(url.replace("\\", "\\\\").replace('"', '\\"'))
+            for url in urls[start : start + PURGE_BATCH_SIZE]
+        )
+        futures.append(
+            PURGE_EXECUTOR.submit(
+                run,
+                ["curl", "--silent", "--globoff", "-XPURGE", "--config", "-"],
+                config,
+            )
+        )
+    return futures
+
+
 def build_sitemap(www_root):
     if not Path(www_root).exists():
         logging.info("Skipping sitemap generation (www root does not even exists).")
@@ -519,8 +981,15 @@ def copy_build_to_webroot(
     quick,
     skip_cache_invalidation,
     www_root,
+    copy_dist=True,
 ):
-    """Copy a given build to the appropriate webroot with appropriate rights."""
+    """Copy a given build to the appropriate webroot with appropriate rights.
+
+    Archives from Doc/dist are only copied if copy_dist is true, on non
+    quick builds.
+
+    Returns the futures of the CDN purges, which may still be running.
+    """
     logging.info(
         "Publishing start for version: %s, language: %s", version.name, language.tag
     )
@@ -550,23 +1019,13 @@ def copy_build_to_webroot(
     except subprocess.CalledProcessError as err:
         logging.warning("Can't change group of %s: %s", target, str(err))
 
-    changed = changed_files(os.path.join(checkout, "Doc/build/html"), target)
-    logging.info("Copying HTML files to %s", target)
-    run(["chown", "-R", ":" + group, os.path.join(checkout, "Doc/build/html/")])
-    run(["chmod", "-R", "o+r", os.path.join(checkout, "Doc/build/html/")])
-    run(
-        [
-            "find",
-            os.path.join(checkout, "Doc/build/html/"),
-            "-type",
-            "d",
-            "-exec",
-            "chmod",
-            "o+x",
-            "{}",
-            ";",
-        ]
+    hashes_file = hashes_cache_path(build_root, version, language)
+    hashes = load_json(hashes_file) or {}
+    changed, hashes = changed_files(
+        os.path.join(checkout, "Doc/build/html"), target, hashes, sync_mtimes=True
     )
+    logging.info("Copying HTML files to %s", target)
+    make_world_readable(os.path.join(checkout, "Doc/build/html"), group)
     if quick:
         run(["rsync", "-a", os.path.join(checkout, "Doc/build/html/"), target])
     else:
@@ -581,38 +1040,107 @@ def copy_build_to_webroot(
                 target,
             ]
         )
-    if not quick:
-        logging.debug("Copying dist files")
-        run(["chown", "-R", ":" + group, os.path.join(checkout, "Doc/dist/")])
-        run(["chmod", "-R", "o+r", os.path.join(checkout, os.path.join("Doc/dist/"))])
-        run(["mkdir", "-m", "o+rx", "-p", os.path.join(target, "archives")])
-        run(["chown", ":" + group, os.path.join(target, "archives")])
-        run(
-            [
-                "cp",
-                "-a",
-                *[str(dist) for dist in (Path(checkout) / "Doc" / "dist").glob("*")],
-                os.path.join(target, "archives"),
-            ]
-        )
-        changed.append("archives/")
-        for fn in os.listdir(os.path.join(target, "archives")):
-            changed.append("archives/" + fn)
-
-    logging.info("%s files changed", len(changed))
+    dump_json(hashes, hashes_file)
+    logging.info("%s HTML files changed", len(changed))
+    purges = []
     if changed and not skip_cache_invalidation:
-        targets_dir = www_root
-        prefixes = run(["find", "-L", targets_dir, "-samefile", target]).stdout
-        prefixes = prefixes.replace(targets_dir + "/", "")
-        prefixes = [prefix + "/" for prefix in prefixes.split("\n") if prefix]
-        to_purge = prefixes[:]
-        for prefix in prefixes:
-            to_purge.extend(prefix + p for p in changed)
-        logging.info("Running CDN purge")
-        run(["curl", "-XPURGE", "https://docs.python.org/{%s}" % ",".join(to_purge)])
+        prefixes = cdn_prefixes(www_root, target)
+        purges.extend(
+            purge_in_background(
+                prefixes + [prefix + path for prefix in prefixes for path in changed]
+            )
+        )
+    if not quick and copy_dist:
+        logging.debug("Copying dist files")
+        make_world_readable(os.path.join(checkout, "Doc/dist"), group)
+        archives = os.path.join(target, "archives")
+        run(["mkdir", "-m", "o+rx", "-p", archives])
+        run(["chown", ":" + group, archives])
+        gid = group_id(group)
+        for dist in os.scandir(os.path.join(checkout, "Doc", "dist")):
+            destination = os.path.join(archives, dist.name)
+            if dist.is_dir():
+                shutil.rmtree(destination, ignore_errors=True)
+                shutil.copytree(dist.path, destination, symlinks=True)
+                make_world_readable(destination, group)
+            else:
+                shutil.copy2(dist.path, destination)
+                os.chown(destination, -1, gid)
+        if not skip_cache_invalidation:
+            archives_changed = ["archives/"]
+            for fn in os.listdir(archives):
+                archives_changed.append("archives/" + fn)
+            purges.extend(
+                purge_in_background(
+                    [
+                        prefix + path
+                        for prefix in cdn_prefixes(www_root, target)
+                        for path in archives_changed
+                    ]
+                )
+            )
     logging.info(
         "Publishing done for version: %s, language: %s", version.name, language.tag
     )
+    return purges
+
+
+def build_and_publish(version, language: Language, venv: Venv, args):
+    """Build and publish a single (version, language) pair.
+
+    Returns the futures of the CDN purges, which run in the background.
+    """
+    build = build_one(
+        version,
+        args.quick,
+        venv,
+        args.build_root,
+        args.log_directory,
+        language,
+        args.sphinx_jobs,
+        args.theme,
+    )
+    purges = copy_build_to_webroot(
+        args.build_root,
+        version,
+        language,
+        args.group,
+        args.quick,
+        args.skip_cache_invalidation,
+        args.www_root,
+        build.dist_built,
+    )
+    # Only now that the build is published can it be considered up to date.
+    for path, data in build.records.items():
+        dump_json(data, path)
+    return purges
+
+
+def build_and_publish_in_worker(version, language: Language, venv: Venv, args):
+    """Like build_and_publish, waiting for the purges before returning.
+
+    This is the unit of work of worker processes, which may exit without
+    waiting for their background purges, and can't hand futures back.
+    """
+    purges = build_and_publish(version, language, venv, args)
+    wait(purges)
+    for purge in purges:
+        purge.result()
+
+
+def report_build_failure(version, language: Language, err):
+    """Log and report to sentry an exception raised by build_and_publish."""
+    logging.error(
+        "Exception while building %s version %s",
+        language.tag,
+        version.name,
+        exc_info=err,
+    )
+    if sentry_sdk:
+        with sentry_sdk.configure_scope() as scope:
+            scope.set_tag("version", version.name)
+            scope.set_tag("language", language.tag)
+        sentry_sdk.capture_exception(err)
 
 
 def head(lines, n=10):
@@ -654,6 +1182,23 @@ def version_info():
     )
 
 
+def positive_int(value):
+    """Argument type for strictly positive integers."""
+    from argparse import ArgumentTypeError
+
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError("{} is not a positive integer".format(value))
+    return number
+
+
+def sphinx_jobs(value):
+    """Argument type for sphinx-build -j: "auto" or a positive integer."""
+    if value == "auto":
+        return value
+    return str(positive_int(value))
+
+
 def parse_args():
     from argparse import ArgumentParser
 
@@ -719,6 +1264,20 @@ def parse_args():
         help="Language translation, as a PEP 545 language tag like" " 'fr' or 'pt-br'.",
         metavar="fr",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=1,
+        help="Number of (version, language) builds to run in parallel.",
+    )
+    parser.add_argument(
+        "--sphinx-jobs",
+        type=sphinx_jobs,
+        default="auto",
+        help="Number of processes each sphinx-build may use (sphinx-build -j). "
+        "Defaults to the CPU count divided by --jobs.",
+    )
     parser.add_argument(
         "--version",
         action="store_true",
@@ -759,6 +1318,9 @@ def main():
     if args.www_root:
         args.www_root = os.path.abspath(args.www_root)
     setup_logging(args.log_directory)
+    if args.sphinx_jobs == "auto" and args.jobs > 1:
+        # Avoid oversubscribing the CPUs with jobs * cpu_count processes.
+        args.sphinx_jobs = str(max(1, (os.cpu_count() or 1) // args.jobs))
     if args.branch:
         versions_to_build = [
             version
@@ -771,43 +1333,73 @@ def main():
             for version in VERSIONS
             if version.status != "EOL" and version.status != "security-fixes"
         ]
+    venvs = {}
     for version in versions_to_build:
-        for language_tag in args.languages:
+        try:
+            venvs[version.name] = build_venv(args.build_root, version, args.theme)
+        except Exception as err:
+            logging.exception("Exception while building venv for %s", version.name)
+            if sentry_sdk:
+                sentry_sdk.capture_exception(err)
+    try:
+        update_cpython_mirror(os.path.join(args.build_root, "cpython.git"))
+    except Exception as err:
+        logging.exception("Exception while updating the cpython mirror")
+        if sentry_sdk:
+            sentry_sdk.capture_exception(err)
+    todo = [
+        (version, languages_dict[language_tag])
+        for version in versions_to_build
+        if version.name in venvs
+        for language_tag in args.languages
+    ]
+    # Purges run while the next builds do, they are waited for at the end.
+    pending_purges = []
+    if args.jobs == 1:
+        for version, language in todo:
             if sentry_sdk:
                 with sentry_sdk.configure_scope() as scope:
                     scope.set_tag("version", version.name)
-                    scope.set_tag("language", language_tag)
-            language = languages_dict[language_tag]
+                    scope.set_tag("language", language.tag)
             try:
-                venv = build_venv(args.build_root, version, args.theme)
-                build_one(
-                    version,
-                    args.quick,
-                    venv,
-                    args.build_root,
-                    args.group,
-                    args.log_directory,
-                    language,
-                )
-                copy_build_to_webroot(
-                    args.build_root,
+                purges = build_and_publish(version, language, venvs[version.name], args)
+            except Exception as err:
+                report_build_failure(version, language, err)
+            else:
+                pending_purges.extend((version, language, purge) for purge in purges)
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {
+                executor.submit(
+                    build_and_publish_in_worker,
                     version,
                     language,
-                    args.group,
-                    args.quick,
-                    args.skip_cache_invalidation,
-                    args.www_root,
-                )
-            except Exception as err:
-                logging.exception(
-                    "Exception while building %s version %s",
-                    language_tag,
-                    version.name,
-                )
-                if sentry_sdk:
-                    sentry_sdk.capture_exception(err)
+                    venvs[version.name],
+                    args,
+                ): (version, language)
+                for version, language in todo
+            }
+            for future in as_completed(futures):
+                version, language = futures[future]
+                try:
+                    future.result()
+                except Exception as err:
+                    report_build_failure(version, language, err)
+    # Once no build is writing there anymore: concurrent builds rename
+    # their temporary files away while chgrp walks the directory.
+    if os.path.isdir(args.log_directory):
+        try:
+            run(["chgrp", "-R", args.group, args.log_directory])
+        except subprocess.CalledProcessError:
+            logging.exception("Can't give %s to its group", args.log_directory)
     build_sitemap(args.www_root)
     build_robots_txt(args.www_root, args.group, args.skip_cache_invalidation)
+    for version, language, purge in pending_purges:
+        try:
+            purge.result()
+        except Exception as err:
+            report_build_failure(version, language, err)
+    PURGE_EXECUTOR.shutdown()
 
 
 if __name__ == "__main__":